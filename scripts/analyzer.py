@@ -6,12 +6,17 @@ Generates build configurations from a simple tweakslist without hitting GitHub A
 Uses sensible defaults and minimal detection.
 
 Usage:
-    python scripts/analyzer.py
+    python scripts/analyzer.py [--force]
 """
 
+import argparse
+import array
+import hashlib
+import heapq
 import json
 import os
 import sys
+from collections import namedtuple
 
 ###############################################################################
 # Configuration
@@ -20,6 +25,7 @@ import sys
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 CONFIG_PATH = os.path.join(PROJECT_ROOT, "config.json")
+CACHE_PATH = os.path.join(PROJECT_ROOT, ".analyzer.cache.json")
 
 DEFAULT_BUILD_CMD = "make clean package DEBUG=0 FINALPACKAGE=1"
 
@@ -28,33 +34,33 @@ DEFAULT_BUILD_CMD = "make clean package DEBUG=0 FINALPACKAGE=1"
 # "../YTVideoOverlay/Header.h" and therefore require the dep to be cloned
 # as a sibling directory in /tmp/ before compilation.
 KNOWN_DEPENDENCIES = {
-    "youpip":      ["ytvideooverlay"],
-    "youtimestamp":["ytvideooverlay"],
-    "youquality":  ["ytvideooverlay"],
-    "youmute":     ["ytvideooverlay"],
-    "youspeed":    ["ytvideooverlay"],
+    "youpip":      ("ytvideooverlay",),
+    "youtimestamp":("ytvideooverlay",),
+    "youquality":  ("ytvideooverlay",),
+    "youmute":     ("ytvideooverlay",),
+    "youspeed":    ("ytvideooverlay",),
 }
 
 # Header dependencies (which headers each tweak needs)
 HEADER_DEPENDENCIES = {
     # Most YouTube tweaks need YouTubeHeader
-    "ytlite": ["YouTubeHeader", "PSHeader"],
-    "youtimestamp": ["YouTubeHeader"],
-    "youpip": ["YouTubeHeader"],
-    "youquality":  ["YouTubeHeader"],
-    "youmute":     ["YouTubeHeader"],
-    "youspeed":    ["YouTubeHeader"],
-    "ytvideooverlay": ["YouTubeHeader"],
-    "returnyoutubedislikes": ["YouTubeHeader"],
-    "ytuhd": ["YouTubeHeader"],
-    "youtubeextensions": ["YouTubeHeader", "PSHeader"],
-    "openyoutubesafariextension": ["YouTubeHeader"],
-    "donteatmycontent": ["YouTubeHeader", "YTHeaders"],
-    "ytnohovercards": ["YouTubeHeader"],
-    "ytab": ["YouTubeHeader"],
-    "ytnoshorts": ["YouTubeHeader"],
-    "ytclassicvideoquality": ["YouTubeHeader"],
-    "ytnocommunityguidelinesendscreen": ["YouTubeHeader"],
+    "ytlite": ("YouTubeHeader", "PSHeader"),
+    "youtimestamp": ("YouTubeHeader",),
+    "youpip": ("YouTubeHeader",),
+    "youquality":  ("YouTubeHeader",),
+    "youmute":     ("YouTubeHeader",),
+    "youspeed":    ("YouTubeHeader",),
+    "ytvideooverlay": ("YouTubeHeader",),
+    "returnyoutubedislikes": ("YouTubeHeader",),
+    "ytuhd": ("YouTubeHeader",),
+    "youtubeextensions": ("YouTubeHeader", "PSHeader"),
+    "openyoutubesafariextension": ("YouTubeHeader",),
+    "donteatmycontent": ("YouTubeHeader", "YTHeaders"),
+    "ytnohovercards": ("YouTubeHeader",),
+    "ytab": ("YouTubeHeader",),
+    "ytnoshorts": ("YouTubeHeader",),
+    "ytclassicvideoquality": ("YouTubeHeader",),
+    "ytnocommunityguidelinesendscreen": ("YouTubeHeader",),
     # Add more as needed - default will be YouTubeHeader if not specified
 }
 
@@ -66,10 +72,10 @@ HEADER_REPOS = {
 }
 
 # Tweaks known to have releases (hardcoded to avoid API calls)
-HAS_RELEASES = {
+HAS_RELEASES = frozenset({
     "ytlite",
     "returnyoutubedislikes",
-}
+})
 
 # Special build commands (hardcoded to avoid API calls)
 SPECIAL_BUILD_CMDS = {
@@ -77,10 +83,10 @@ SPECIAL_BUILD_CMDS = {
 }
 
 # .appex bundles (hardcoded)
-APPEX_REPOS = {
+APPEX_REPOS = frozenset({
     "youtubeextensions",
     "openyoutubesafariextension",
-}
+})
 
 # Tweaks that are known-broken against the current YouTubeHeader / YouTube version
 # and should be excluded from the build entirely.
@@ -119,11 +125,13 @@ PRE_BUILD_CMDS = {
 # Utility Functions
 ###############################################################################
 
+# Strips common separators from repo names in a single pass
+_NORMALIZE_TABLE = str.maketrans("", "", "-_.")
+
+
 def normalize_id(repo):
     """Convert 'Owner/RepoName' to 'reponame'."""
-    name = repo.split("/")[-1]
-    # Remove common separators
-    return name.replace("-", "").replace("_", "").replace(".", "").lower()
+    return repo.rsplit("/", 1)[-1].translate(_NORMALIZE_TABLE).lower()
 
 
 def make_id(repo):
@@ -131,51 +139,103 @@ def make_id(repo):
     return normalize_id(repo)
 
 
+###############################################################################
+# Per-tweak Metadata
+###############################################################################
+
+# Everything the analyzer needs for a tweak, resolved from the tables above
+TweakMeta = namedtuple(
+    "TweakMeta",
+    ["fetch", "build_cmd", "depends_on", "headers", "deb_opts", "pre_build_cmd"],
+)
+
+DEFAULT_META = TweakMeta(
+    fetch="build",
+    build_cmd=DEFAULT_BUILD_CMD,
+    depends_on=(),
+    headers=("YouTubeHeader",),
+    deb_opts={},
+    pre_build_cmd=None,
+)
+
+
+def build_tweak_meta():
+    """Fuse the hardcoded tables into a single tweak_id -> TweakMeta mapping."""
+    tweak_ids = (
+        HAS_RELEASES
+        | APPEX_REPOS
+        | SPECIAL_BUILD_CMDS.keys()
+        | KNOWN_DEPENDENCIES.keys()
+        | HEADER_DEPENDENCIES.keys()
+        | DEB_FILTERS.keys()
+        | PRE_BUILD_CMDS.keys()
+    )
+
+    meta = {}
+    for tweak_id in tweak_ids:
+        if tweak_id in HAS_RELEASES:
+            fetch = "release"
+        elif tweak_id in APPEX_REPOS:
+            fetch = "appex"
+        else:
+            fetch = "build"
+
+        meta[tweak_id] = TweakMeta(
+            fetch=fetch,
+            build_cmd=SPECIAL_BUILD_CMDS.get(tweak_id, DEFAULT_META.build_cmd),
+            depends_on=KNOWN_DEPENDENCIES.get(tweak_id, DEFAULT_META.depends_on),
+            headers=HEADER_DEPENDENCIES.get(tweak_id, DEFAULT_META.headers),
+            deb_opts=DEB_FILTERS.get(tweak_id, DEFAULT_META.deb_opts),
+            pre_build_cmd=PRE_BUILD_CMDS.get(tweak_id, DEFAULT_META.pre_build_cmd),
+        )
+    return meta
+
+
+TWEAK_META = build_tweak_meta()
+
+
 ###############################################################################
 # Simple Analyzer
 ###############################################################################
 
-def analyze_tweak(repo, all_tweaks):
-    """Analyze a single tweak with minimal detection."""
-    tweak_id = make_id(repo)
+def analyze_tweak(repo, tweak_id, all_tweaks, log=None):
+    """Analyze a single tweak with minimal detection.
+
+    Log lines are appended to ``log`` when given so the caller can emit them
+    in one write; otherwise they are written to stdout before returning.
+    """
+    emit = log is None
+    if emit:
+        log = []
+
+    log.append(f"Analyzing {repo}...")
 
-    print(f"Analyzing {repo}...")
+    # Resolve everything for this tweak in a single lookup
+    meta = TWEAK_META.get(tweak_id, DEFAULT_META)
+    fetch, build_cmd, depends_on, headers, deb_opts, pre_build_cmd = meta
 
-    # Determine fetch method
-    if tweak_id in HAS_RELEASES:
-        fetch = "release"
-        print(f"  ✓ {tweak_id}: fetch=release (known to have releases)")
-    elif tweak_id in APPEX_REPOS:
-        fetch = "appex"
-        print(f"  ✓ {tweak_id}: fetch=appex (contains .appex)")
+    if fetch == "release":
+        log.append(f"  ✓ {tweak_id}: fetch=release (known to have releases)")
+    elif fetch == "appex":
+        log.append(f"  ✓ {tweak_id}: fetch=appex (contains .appex)")
     else:
-        fetch = "build"
-        print(f"  ✓ {tweak_id}: fetch=build (default)")
+        log.append(f"  ✓ {tweak_id}: fetch=build (default)")
 
-    # Get build command
-    build_cmd = SPECIAL_BUILD_CMDS.get(tweak_id, DEFAULT_BUILD_CMD)
     if build_cmd != DEFAULT_BUILD_CMD:
-        print(f"    Special build command: {build_cmd}")
+        log.append(f"    Special build command: {build_cmd}")
 
-    # Get dependencies
-    depends_on = KNOWN_DEPENDENCIES.get(tweak_id, [])
     if depends_on:
-        print(f"    Dependencies: {depends_on}")
+        log.append(f"    Dependencies: {list(depends_on)}")
 
-    # Get header dependencies
-    headers = HEADER_DEPENDENCIES.get(tweak_id, ["YouTubeHeader"])
     if headers:
-        print(f"    Required headers: {', '.join(headers)}")
+        log.append(f"    Required headers: {', '.join(headers)}")
 
-    # Get deb asset filters (for release tweaks with multiple variants)
-    deb_opts = DEB_FILTERS.get(tweak_id, {})
+    # Deb asset filters (for release tweaks with multiple variants)
     if deb_opts:
-        print(f"    Deb filters: {deb_opts}")
+        log.append(f"    Deb filters: {deb_opts}")
 
-    # Get pre-build patch command
-    pre_build_cmd = PRE_BUILD_CMDS.get(tweak_id)
     if pre_build_cmd:
-        print(f"    Pre-build patch: {pre_build_cmd}")
+        log.append(f"    Pre-build patch: {pre_build_cmd}")
 
     # Build config
     config = {
@@ -195,13 +255,16 @@ def analyze_tweak(repo, all_tweaks):
             config["deb_exclude"] = deb_opts["deb_exclude"]
 
     if depends_on:
-        config["depends_on"] = depends_on
+        config["depends_on"] = list(depends_on)
 
     if pre_build_cmd:
         config["pre_build_cmd"] = pre_build_cmd
 
     if headers:
-        config["headers"] = headers
+        config["headers"] = list(headers)
+
+    if emit:
+        sys.stdout.write("\n".join(log) + "\n")
 
     return config
 
@@ -217,24 +280,34 @@ def topological_sort(configs):
         all_ids.add(tweak_id)
         graph[tweak_id] = set(cfg.get("depends_on", []))
 
+    # Index nodes in sorted order so comparing indices orders by name
+    names = sorted(all_ids)
+    idx = {node: i for i, node in enumerate(names)}
+
+    # Reverse adjacency: node -> tweaks that depend on it
+    reverse = [[] for _ in names]
+    for node, deps in graph.items():
+        for dep in deps:
+            if dep in idx:
+                reverse[idx[dep]].append(idx[node])
+
     # Kahn's algorithm - count how many dependencies each node has
-    in_degree = {node: len(graph[node]) for node in all_ids}
+    in_degree = array.array("i", [len(graph[node]) for node in names])
 
-    # Start with nodes that have no dependencies
-    queue = [node for node in all_ids if in_degree[node] == 0]
+    # Start with nodes that have no dependencies (heap keeps order deterministic)
+    queue = [i for i, degree in enumerate(in_degree) if degree == 0]
+    heapq.heapify(queue)
     result = []
 
     while queue:
-        queue.sort()  # For deterministic order
-        node = queue.pop(0)
-        result.append(node)
+        i = heapq.heappop(queue)
+        result.append(names[i])
 
         # For each tweak that depends on this node, decrement its in_degree
-        for other in all_ids:
-            if node in graph.get(other, set()):
-                in_degree[other] -= 1
-                if in_degree[other] == 0:
-                    queue.append(other)
+        for other in reverse[i]:
+            in_degree[other] -= 1
+            if not in_degree[other]:
+                heapq.heappush(queue, other)
 
     if len(result) != len(all_ids):
         print("⚠️  Warning: Circular dependency detected, using arbitrary order")
@@ -243,13 +316,58 @@ def topological_sort(configs):
     return result
 
 
-def collect_all_headers(configs):
-    """Collect all unique headers needed across all tweaks."""
-    all_headers = set()
-    for cfg in configs:
-        headers = cfg.get("headers", [])
-        all_headers.update(headers)
-    return sorted(all_headers)
+###############################################################################
+# Cache
+###############################################################################
+
+def digest_bytes(data):
+    """Short blake2b hex digest of some bytes."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def compute_cache_key(tweakslist):
+    """Hash the tweakslist, this script's source and every table that affects the output."""
+    with open(__file__, "rb") as f:
+        source_digest = digest_bytes(f.read())
+
+    payload = json.dumps([
+        source_digest,
+        tweakslist,
+        DEFAULT_BUILD_CMD,
+        sorted(KNOWN_DEPENDENCIES.items()),
+        sorted(HEADER_DEPENDENCIES.items()),
+        sorted(HEADER_REPOS.items()),
+        sorted(SPECIAL_BUILD_CMDS.items()),
+        sorted(SKIPPED_TWEAKS.items()),
+        sorted(DEB_FILTERS.items()),
+        sorted(PRE_BUILD_CMDS.items()),
+        sorted(HAS_RELEASES),
+        sorted(APPEX_REPOS),
+    ], sort_keys=True, default=list)
+    return digest_bytes(payload.encode("utf-8"))
+
+
+def load_cache():
+    """Return the cache sidecar contents, or an empty dict if unavailable."""
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def write_json_atomic(path, data):
+    """Serialize JSON up front, write it in one call and atomically move it into place.
+
+    Returns the bytes written.
+    """
+    payload = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8") + b"\n"
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    return payload
 
 
 ###############################################################################
@@ -258,6 +376,14 @@ def collect_all_headers(configs):
 
 def main():
     """Main analyzer logic."""
+    parser = argparse.ArgumentParser(description="Generate build configurations from config.json")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="re-run the analysis even if the cache says config.json is up to date",
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("YTLitePlus Tweak Analyzer (Simplified)")
     print("=" * 60)
@@ -268,26 +394,45 @@ def main():
         print(f"❌ Config file not found: {CONFIG_PATH}")
         sys.exit(1)
 
-    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-        config = json.load(f)
+    with open(CONFIG_PATH, "rb") as f:
+        config_bytes = f.read()
+    config = json.loads(config_bytes)
 
     tweakslist = config.get("tweakslist", [])
     if not tweakslist:
         print("❌ No tweaks found in config.json tweakslist")
         sys.exit(1)
 
+    # Skip the whole pipeline if nothing that affects the output has changed
+    # and config.json is still exactly what the last run wrote
+    cache_key = compute_cache_key(tweakslist)
+    cache = load_cache()
+    if (
+        not args.force
+        and cache.get("key") == cache_key
+        and cache.get("config_digest") == digest_bytes(config_bytes)
+    ):
+        print(f"✅ Cache hit ({cache_key}), {CONFIG_PATH} is up to date")
+        return
+
     print(f"Found {len(tweakslist)} tweak(s) to analyze")
     print()
 
+    # Compute each tweak's ID once and reuse it below
+    ids = [make_id(repo) for repo in tweakslist]
+
     # Filter out tweaks that are known-broken
-    skipped = []
-    active_tweakslist = []
-    for repo in tweakslist:
-        tid = make_id(repo)
-        if tid in SKIPPED_TWEAKS:
-            skipped.append((repo, SKIPPED_TWEAKS[tid]))
-        else:
-            active_tweakslist.append(repo)
+    skipped_ids = SKIPPED_TWEAKS.keys() & set(ids)
+    skipped = [
+        (repo, SKIPPED_TWEAKS[tid])
+        for tid, repo in zip(ids, tweakslist)
+        if tid in skipped_ids
+    ]
+    active = [
+        (tid, repo)
+        for tid, repo in zip(ids, tweakslist)
+        if tid not in skipped_ids
+    ]
 
     if skipped:
         print("⏭️  Skipping incompatible tweaks:")
@@ -295,22 +440,26 @@ def main():
             print(f"  • {repo}: {reason}")
         print()
 
-    tweakslist = active_tweakslist
+    tweakslist = [repo for _, repo in active]
 
     # Build mapping of all tweaks
-    all_tweaks = {make_id(repo): repo for repo in tweakslist}
+    all_tweaks = dict(active)
 
     # Analyze each tweak
     configs = []
-    for repo in tweakslist:
+    log = []
+    for tid, repo in active:
         try:
-            cfg = analyze_tweak(repo, all_tweaks)
+            cfg = analyze_tweak(repo, tid, all_tweaks, log)
             configs.append(cfg)
         except Exception as e:
-            print(f"❌ Failed to analyze {repo}: {e}")
+            log.append(f"❌ Failed to analyze {repo}: {e}")
+            sys.stdout.write("\n".join(log) + "\n")
             sys.exit(1)
 
-    print()
+    # Emit the whole analysis log in a single write
+    log.append("")
+    sys.stdout.write("\n".join(log) + "\n")
 
     # Build order
     build_order = topological_sort(configs)
@@ -318,12 +467,18 @@ def main():
     print("Build order:", " → ".join(build_order))
     print()
 
-    # Collect all required headers
-    required_headers = collect_all_headers(configs)
+    # Collect all required headers and their repos in one pass over configs
+    required_headers = set()
     header_config = {}
-    for header in required_headers:
-        if header in HEADER_REPOS:
-            header_config[header] = HEADER_REPOS[header]
+    for cfg in configs:
+        for header in cfg.get("headers", ()):
+            required_headers.add(header)
+            if header in HEADER_REPOS and header not in header_config:
+                header_config[header] = HEADER_REPOS[header]
+
+    # Keep both sorted by name so config.json stays stable across runs
+    required_headers = sorted(required_headers)
+    header_config = dict(sorted(header_config.items()))
 
     if header_config:
         print("Required headers:")
@@ -340,14 +495,18 @@ def main():
         "metadata": {
             "total_tweaks": len(tweakslist),
             "successfully_analyzed": len(configs),
-            "required_headers": list(required_headers),
+            "required_headers": required_headers,
         }
     }
 
     # Save
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    config_bytes = write_json_atomic(CONFIG_PATH, output)
+    # Key on the list we just wrote (skipped tweaks removed), since that is
+    # what the next run will read back
+    write_json_atomic(CACHE_PATH, {
+        "key": compute_cache_key(tweakslist),
+        "config_digest": digest_bytes(config_bytes),
+    })
 
     print(f"✅ Updated {CONFIG_PATH}")
     print(f"✅ Successfully analyzed {len(configs)}/{len(tweakslist)} tweaks")